@@ -3,14 +3,19 @@ from __future__ import absolute_import, print_function, unicode_literals
 from os import stat
 import unicodedata
 
+import os
 import os.path
-from functools import reduce
+import pickle
+import sys
+import tempfile
+from itertools import combinations
+from functools import lru_cache
 
 import numpy
 import pkg_resources
 
 import regex as re
-import unicodecsv as csv
+import csv
 
 from panphon import featuretable
 
@@ -28,25 +33,52 @@ SEG_REGEX = re.compile(r'[\p{InBasic_Latin}\p{InGreek_and_Coptic}' +
                        r'[\u0300-\u0360\u0362-\u036F]*' +
                        r'\p{InSpacing_Modifier_Letters}*',
                        re.U | re.X)
+_seg_findall = SEG_REGEX.findall
+MASK_SLOTS = {'+': 0, '-': 1, '0': 2}
+# Bumped whenever the layout of the pickled feature table cache changes.
+TABLE_CACHE_FORMAT = 2
 filenames = {
     'spe+': os.path.join('data', 'ipa_all.csv'),
     'panphon': os.path.join('data', 'ipa_all.csv'),
 }
 
 
-def segment_text(text, seg_regex=SEG_REGEX):
+def segment_text(text, seg_regex=SEG_REGEX, intern=False):
     """Return an iterator of segments in the text.
 
     Args:
         text (unicode): string of IPA Unicode text
         seg_regex (_regex.Pattern): compiled regex defining a segment (base +
                                     modifiers)
+        intern (bool): if True, intern the segments, so that looking them up
+                       in `FeatureTable.seg_dict` (whose keys are interned) is
+                       faster
 
     Return:
         generator: segments in the input text
     """
-    for m in seg_regex.finditer(text):
-        yield m.group(0)
+    if seg_regex is SEG_REGEX:
+        segs = segment_tuple(text)
+    else:
+        segs = (m.group(0) for m in seg_regex.finditer(text))
+    for seg in segs:
+        yield sys.intern(seg) if intern else seg
+
+
+@lru_cache(maxsize=2048)
+def segment_tuple(text):
+    """Return all of the segments in the text at once, as defined by
+    `SEG_REGEX`. Results are memoized, so re-segmenting the same text is cheap.
+
+    Args:
+        text (unicode): string of IPA Unicode text
+
+    Return:
+        tuple: segments in the input text
+    """
+    # SEG_REGEX has no groups, so findall returns the whole matches without
+    # building a match object for each segment.
+    return tuple(_seg_findall(text))
 
 
 def fts(s):
@@ -78,6 +110,79 @@ def pat(p):
     return pattern
 
 
+def match_masks(mask, seg_masks):
+    """Answer question "are `mask`'s features a subset of `seg_masks`?"
+
+    Args:
+        mask (tuple): (plus, minus, zero) bitmasks of a feature mask
+        seg_masks (tuple): (plus, minus, zero) bitmasks of a segment
+
+    Returns:
+        bool: True iff every bit set in `mask` is also set in `seg_masks`
+    """
+    mp, mm, mz = mask
+    sp, sm, sz = seg_masks
+    return (mp & sp) == mp and (mm & sm) == mm and (mz & sz) == mz
+
+
+def diff_masks(seg_masks1, seg_masks2):
+    """Return a bitmask of the features in which two segments differ.
+
+    Args:
+        seg_masks1 (tuple): (plus, minus, zero) bitmasks of a segment
+        seg_masks2 (tuple): (plus, minus, zero) bitmasks of a segment
+
+    Returns:
+        int: bitmask with bit `i` set iff the segments differ in feature `i`
+    """
+    return ((seg_masks1[0] ^ seg_masks2[0]) | (seg_masks1[1] ^ seg_masks2[1]) |
+            (seg_masks1[2] ^ seg_masks2[2]))
+
+
+def mask_words(mask, n_words):
+    """Split an int bitmask into `n_words` 64-bit words, lowest first."""
+    if n_words == 1:
+        return [mask]
+    return [(mask >> (64 * w)) & 0xFFFFFFFFFFFFFFFF for w in range(n_words)]
+
+
+def masks_to_array(seg_masks, n_words):
+    """Pack (plus, minus, zero) bitmasks into a uint64 array.
+
+    Args:
+        seg_masks (list): (plus, minus, zero) bitmasks, one triple per segment
+        n_words (int): number of 64-bit words needed per bitmask
+
+    Returns:
+        ndarray: uint64 array of shape (len(seg_masks), 3, n_words)
+    """
+    if n_words > 1:
+        seg_masks = [[word for m in masks for word in mask_words(m, n_words)]
+                     for masks in seg_masks]
+    return numpy.array(seg_masks, dtype=numpy.uint64).reshape(-1, 3, n_words)
+
+
+def match_inventory(mask, inv_masks):
+    """Vectorized `match_masks` over an encoded inventory.
+
+    Args:
+        mask (tuple): (plus, minus, zero) bitmasks of a feature mask
+        inv_masks (tuple): (plus, minus, zero) arrays of bitmasks, as returned
+                           by `FeatureTable.encode_inventory`
+
+    Returns:
+        ndarray: boolean array, True where the segment matches `mask`
+    """
+    n_segs, n_words = inv_masks[0].shape
+    matches = numpy.ones(n_segs, dtype=bool)
+    for (m, arr) in zip(mask, inv_masks):
+        for (w, word) in enumerate(mask_words(m, n_words)):
+            if word:
+                word = numpy.uint64(word)
+                matches &= (arr[:, w] & word) == word
+    return matches
+
+
 def word2array(ft_names, word):
     """Converts `word` [[(value, feature),...],...] to a NumPy array
 
@@ -109,6 +214,17 @@ class FeatureTable(object):
     """Encapsulate the segment <=> feature mapping in the file
     "data/ipa_all.csv".
     """
+    TRIE_LEAF_MARKER = None
+    # Parsed tables, keyed on (class, filename), shared by all instances built
+    # from the same file. Their attributes must be treated as read-only.
+    _TABLE_CACHE = {}
+    _TABLE_ATTRS = ('seg_dict', 'names', 'seg_seq', '_name_idx', '_seg_masks',
+                    'weights', 'seg_regex', 'seg_trie', 'longest_seg')
+    # Bitmasks of all segments, one row per segment in the order of `seg_seq`;
+    # built on first use by `encode_inventory`.
+    _mask_array = None
+    # Instance attributes created by `_init_caches`; excluded from pickles.
+    _CACHED_METHODS = ('_fts_match_cached', '_segment_vector')
 
     def __init__(self, feature_set='spe+'):
         """Construct a FeatureTable object
@@ -119,52 +235,237 @@ class FeatureTable(object):
 
         """
         filename = filenames[feature_set]
-        self.segments, self.seg_dict, self.names = self._read_table(filename)
-        self.seg_seq = {seg[0]: i for (i, seg) in enumerate(self.segments)}
-        self.weights = self._read_weights()
-        self.seg_regex = self._build_seg_regex()
-        self.longest_seg = max([len(x) for x in self.seg_dict.keys()])
+        key = (type(self), filename)
+        if key in FeatureTable._TABLE_CACHE:
+            vars(self).update(FeatureTable._TABLE_CACHE[key])
+        else:
+            self.seg_dict, self.names = self._read_table(filename)
+            self.seg_seq = {seg: i for (i, seg) in enumerate(self.seg_dict)}
+            self._name_idx = {name: i for (i, name) in enumerate(self.names)}
+            self._seg_masks = {seg: self._encode_mask(specs)
+                               for (seg, specs) in self.seg_dict.items()}
+            self.weights = self._read_weights()
+            self.seg_regex = self._build_seg_regex()
+            self.seg_trie = self._build_seg_trie()
+            self.longest_seg = max([len(x) for x in self.seg_dict.keys()])
+            FeatureTable._TABLE_CACHE[key] = {attr: getattr(self, attr)
+                                              for attr in self._TABLE_ATTRS}
         self.xsampa = xsampa.XSampa()
+        self._init_caches()
+
+    def _init_caches(self):
+        """Create the per-instance memoizing wrappers named in
+        `_CACHED_METHODS`. They hold bound methods, so they are dropped when
+        pickling and rebuilt here on unpickling."""
+        self._fts_match_cached = lru_cache(maxsize=4096)(self._fts_match)
+        self._segment_vector = lru_cache(maxsize=4096)(self._vector_from_masks)
+
+    def __getstate__(self):
+        state = vars(self).copy()
+        for attr in self._CACHED_METHODS:
+            state.pop(attr, None)
+        return state
+
+    def __setstate__(self, state):
+        vars(self).update(state)
+        self._init_caches()
 
     @staticmethod
     def normalize(data):
         return unicodedata.normalize('NFD', data)
 
+    @property
+    def segments(self):
+        """List of 2-tuples of unicode segments and sets of feature tuples, in
+        the order of the table; built on demand from `self.seg_dict`.
+        """
+        return list(self.seg_dict.items())
+
     def _read_table(self, filename):
-        """Read the data from data/ipa_all.csv into self.segments, a
-        list of 2-tuples of unicode strings and sets of feature tuples and
-        self.seg_dict, a dictionary mapping from unicode segments and sets of
-        feature tuples.
+        """Read the data from data/ipa_all.csv into a dictionary mapping from
+        unicode segments to sets of feature tuples (self.seg_dict) and a list
+        of feature names (self.names).
         """
         filename = pkg_resources.resource_filename(
             __name__, filename)
-        segments = []
-        with open(filename, 'rb') as f:
-            reader = csv.reader(f, encoding='utf-8')
+        cached = self._load_table_cache(filename)
+        if cached:
+            seg_dict, names = cached
+            seg_dict = {sys.intern(seg): specs
+                        for (seg, specs) in seg_dict.items()}
+            return seg_dict, names
+        seg_dict = {}
+        # Share one tuple per (value, feature) pair across all segments; this
+        # saves memory and keeps the pickled cache small.
+        pairs = {}
+        with open(filename, 'r', encoding='utf-8', newline='') as f:
+            reader = csv.reader(f)
             header = next(reader)
             names = header[1:]
             for row in reader:
-                seg = row[0]
+                seg = sys.intern(row[0])
                 vals = row[1:]
-                specs = set(zip(vals, names))
-                segments.append((seg, specs))
-        seg_dict = dict(segments)
-        return segments, seg_dict, names
+                specs = frozenset([pairs.setdefault(p, p)
+                                   for p in zip(vals, names)])
+                seg_dict[seg] = specs
+        self._write_table_cache(filename, seg_dict, names)
+        return seg_dict, names
+
+    @staticmethod
+    def _table_cache_filename(filename):
+        return os.path.splitext(filename)[0] + '.pkl'
+
+    def _load_table_cache(self, filename):
+        """Return (seg_dict, names) pickled by `_write_table_cache` for the
+        CSV file `filename`, or None if there is no cache or it is stale.
+        """
+        try:
+            with open(self._table_cache_filename(filename), 'rb') as f:
+                version, mtime, seg_dict, names = pickle.load(f)
+        except (OSError, EOFError, ValueError, TypeError,
+                pickle.UnpicklingError):
+            return None
+        if version != TABLE_CACHE_FORMAT or mtime != stat(filename).st_mtime:
+            return None
+        return seg_dict, names
+
+    def _write_table_cache(self, filename, seg_dict, names):
+        # The cache is an optimization only, so failure to write it (e.g.,
+        # because the package directory is read-only) is not an error. It is
+        # written to a temporary file and renamed into place, so concurrent
+        # readers never see a partially written cache.
+        cache_filename = self._table_cache_filename(filename)
+        try:
+            fd, tmp_filename = tempfile.mkstemp(
+                prefix=os.path.basename(cache_filename) + '.',
+                suffix='.tmp', dir=os.path.dirname(cache_filename))
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump((TABLE_CACHE_FORMAT, stat(filename).st_mtime,
+                             seg_dict, names), f, pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_filename, cache_filename)
+        except OSError:
+            try:
+                os.remove(tmp_filename)
+            except OSError:
+                pass
 
     def _read_weights(self, filename=os.path.join('data', 'feature_weights.csv')):
         filename = pkg_resources.resource_filename(
             __name__, filename)
-        with open(filename, 'rb') as f:
-            reader = csv.reader(f, encoding='utf-8')
+        with open(filename, 'r', encoding='utf-8', newline='') as f:
+            reader = csv.reader(f)
             next(reader)
             weights = [float(x) for x in next(reader)]
         return weights
 
+    def _encode_mask(self, fts):
+        """Encode a collection of (value, feature) tuples as bitmasks.
+
+        Bit `i` of each mask corresponds to feature `self.names[i]`.
+
+        Args:
+            fts (list): collection of (value, feature) tuples
+
+        Returns:
+            tuple: (plus, minus, zero) bitmasks as ints; None if `fts` contains
+                   an unknown value or feature name (and so can match nothing)
+        """
+        masks = [0, 0, 0]
+        for (val, name) in fts:
+            if val not in MASK_SLOTS or name not in self._name_idx:
+                return None
+            masks[MASK_SLOTS[val]] |= 1 << self._name_idx[name]
+        return tuple(masks)
+
+    def encode_inventory(self, inv):
+        """Encode the valid segments of an inventory as arrays of bitmasks.
+
+        Args:
+            inv (list): a collection of IPA segments represented as Unicode
+                        strings
+
+        Returns:
+            tuple: (plus, minus, zero) uint64 ndarrays with one row per valid
+                   segment in `inv` (invalid segments are dropped) and one
+                   column per 64 features
+        """
+        if self._mask_array is None:
+            self._mask_array = masks_to_array(list(self._seg_masks.values()),
+                                              self._n_words())
+        seg_seq = self.seg_seq
+        arr = self._mask_array[[seg_seq[s] for s in inv if s in seg_seq]]
+        return arr[:, 0], arr[:, 1], arr[:, 2]
+
+    def _n_words(self):
+        # Number of 64-bit words needed to hold one bit per feature.
+        return max(1, (len(self.names) + 63) // 64)
+
+    def _masks(self, segment):
+        """Return the (plus, minus, zero) bitmasks of `segment`, or None if
+        `segment` is not valid.
+        """
+        return self._seg_masks.get(segment)
+
+    def compile_mask(self, fts):
+        """Return a predicate testing segments against a feature mask
+
+        The mask is encoded once, so the predicate is cheap to apply to many
+        segments.
+
+        Args:
+            fts (list): a collection of (value, feature) tuples
+
+        Returns:
+            function: takes an IPA segment (unicode) and returns `True` iff it
+                      is valid and matches the features in `fts`
+        """
+        mask = self._encode_mask(fts)
+        if mask is None:
+            return lambda segment: False
+        mp, mm, mz = mask
+        masks = self._masks
+
+        def pred(segment):
+            seg_masks = masks(segment)
+            if seg_masks is None:
+                return False
+            sp, sm, sz = seg_masks
+            return (mp & sp) == mp and (mm & sm) == mm and (mz & sz) == mz
+        return pred
+
     def _build_seg_regex(self):
         # Build a regex that will match individual segments in a string.
         segs = sorted(self.seg_dict.keys(), key=lambda x: len(x), reverse=True)
         return re.compile(r'(?P<all>{})'.format('|'.join(segs)))
 
+    def _build_seg_trie(self):
+        # Build a character trie over the segments in the database.
+        trie = {}
+        for seg in self.seg_dict.keys():
+            node = trie
+            for char in seg:
+                if char not in node:
+                    node[char] = {}
+                node = node[char]
+            node[self.TRIE_LEAF_MARKER] = None
+        return trie
+
+    def _trie_match(self, text, pos):
+        # Return the end index of the longest known segment starting at `pos`
+        # in `text`, or `pos` if there is none.
+        end = pos
+        node = self.seg_trie
+        for i in range(pos, len(text)):
+            if text[i] not in node:
+                break
+            node = node[text[i]]
+            if self.TRIE_LEAF_MARKER in node:
+                end = i + 1
+        return end
+
     def fts(self, segment):
         """Returns features corresponding to `segment` as list of (value,
         feature) tuples.
@@ -192,7 +493,11 @@ class FeatureTable(object):
         Returns:
             bool: True iff all features in `ft_mask` are also in `ft_seg`
         """
-        return set(ft_mask) <= set(ft_seg)
+        if not isinstance(ft_mask, (set, frozenset)):
+            ft_mask = frozenset(ft_mask)
+        if not isinstance(ft_seg, (set, frozenset)):
+            ft_seg = frozenset(ft_seg)
+        return ft_mask <= ft_seg
 
     def fts_match(self, features, segment):
         """Answer question "are `ft_mask`'s features a subset of ft_seg?"
@@ -208,11 +513,17 @@ class FeatureTable(object):
             bool: True iff all features in `ft_mask` are also in `ft_seg`; None
                   if segment is not valid
         """
-        features = set(features)
-        if self.seg_known(segment):
-            return features <= self.fts(segment)
-        else:
+        if not isinstance(features, frozenset):
+            features = frozenset(features)
+        return self._fts_match_cached(features, segment)
+
+    def _fts_match(self, features, segment):
+        # Uncached body of `fts_match`; `features` must be a frozenset.
+        seg_masks = self._masks(segment)
+        if seg_masks is None:
             return None
+        mask = self._encode_mask(features)
+        return mask is not None and match_masks(mask, seg_masks)
 
     def longest_one_seg_prefix(self, word, normalize=True):
         """Return longest Unicode IPA prefix of a word
@@ -225,11 +536,7 @@ class FeatureTable(object):
         """
         if normalize:
             word = FeatureTable.normalize(word)
-
-        for i in range(self.longest_seg, 0, -1):
-            if word[:i] in self.seg_dict:
-                return word[:i]
-        return ''
+        return word[:self._trie_match(word, 0)]
 
     def validate_word(self, word):
         """Returns True if `word` consists exhaustively of valid IPA segments
@@ -297,6 +604,23 @@ class FeatureTable(object):
         """
         return segment in self.seg_dict
 
+    def seg_diff(self, seg1, seg2):
+        """Return the names of the features in which two segments differ
+
+        Args:
+            seg1 (unicode): IPA consonant or vowel
+            seg2 (unicode): IPA consonant or vowel
+
+        Returns:
+            list: names of the differing features, in the order of
+                  `FeatureTable.names`; None if either segment is not valid
+        """
+        masks1, masks2 = self._masks(seg1), self._masks(seg2)
+        if masks1 is None or masks2 is None:
+            return None
+        diff = diff_masks(masks1, masks2)
+        return [name for (i, name) in enumerate(self.names) if (diff >> i) & 1]
+
     def segs_safe(self, word):
         """Return a list of segments (as strings) from a word
 
@@ -357,8 +681,10 @@ class FeatureTable(object):
             set: set of (value, feature) tuples shared by the valid segments in
                  `segs`
         """
-        fts_vecs = [self.fts(s) for s in self.filter_segs(segs)]
-        return reduce(lambda a, b: a & b, fts_vecs)
+        fts_vecs = map(self.fts, self.filter_segs(segs))
+        shared = set(next(fts_vecs, ()))
+        shared.intersection_update(*fts_vecs)
+        return shared
 
     def fts_match_any(self, fts, inv):
         """Return `True` if any segment in `inv` matches the features in `fts`
@@ -371,7 +697,7 @@ class FeatureTable(object):
         Returns:
             bool: `True` if any segment in `inv` matches the features in `fts`
         """
-        return any([self.fts_match(fts, s) for s in inv])
+        return any(map(self.compile_mask(fts), inv))
 
     def fts_match_all(self, fts, inv):
         """Return `True` if all segments in `inv` matches the features in fts
@@ -384,7 +710,7 @@ class FeatureTable(object):
         Returns:
             bool: `True` if all segments in `inv` matches the features in `fts`
         """
-        return all([self.fts_match(fts, s) for s in inv])
+        return all(map(self.compile_mask(fts), inv))
 
     def fts_contrast2(self, fs, ft_name, inv):
         """Return `True` if there is a segment in `inv` that contrasts in feature
@@ -399,15 +725,14 @@ class FeatureTable(object):
             bool: `True` if two segments in `inv` are identical in features except
                   for feature `ft_name`
         """
-        inv_fts = [self.fts(x) for x in inv if set(fs) <= self.fts(x)]
-        for a in inv_fts:
-            for b in inv_fts:
-                if a != b:
-                    diff = a ^ b
-                    if len(diff) == 2:
-                        if all([nm == ft_name for (_, nm) in diff]):
-                            return True
-        return False
+        mask = self._encode_mask(fs)
+        if mask is None or ft_name not in self._name_idx:
+            return False
+        ft_bit = 1 << self._name_idx[ft_name]
+        inv_masks = [m for m in map(self._masks, inv)
+                     if m is not None and match_masks(mask, m)]
+        return any(diff_masks(a, b) == ft_bit
+                   for (a, b) in combinations(inv_masks, 2))
 
     def fts_count(self, fts, inv):
         """Return the count of segments in an inventory matching a given
@@ -420,7 +745,7 @@ class FeatureTable(object):
         Returns:
             int: number of segments in `inv` that match feature mask `fts`
         """
-        return len(list(filter(lambda s: self.fts_match(fts, s), inv)))
+        return sum(map(self.compile_mask(fts), inv))
 
     def match_pattern(self, pat, word):
         """Implements fixed-width pattern matching.
@@ -479,7 +804,7 @@ class FeatureTable(object):
             list: segments matching `fts`, sorted in reverse order by length
         """
         matching_segs = []
-        for seg, pairs in self.segments:
+        for seg, pairs in self.seg_dict.items():
             if set(fts) <= set(pairs):
                 matching_segs.append(seg)
         return sorted(matching_segs, key=lambda x: len(x), reverse=True)
@@ -517,8 +842,13 @@ class FeatureTable(object):
             list: feature specifications ('+'/'-'/'0') in the order from
             `FeatureTable.names`
         """
-        ft_dict = {ft: val for (val, ft) in self.fts(seg)}
-        return [ft_dict[name] for name in self.names]
+        return list(self._segment_vector(seg))
+
+    def _vector_from_masks(self, seg):
+        # Uncached body of `segment_to_vector`, returning a tuple.
+        plus, minus, _ = self._masks(seg)
+        return tuple('+' if (plus >> i) & 1 else '-' if (minus >> i) & 1 else '0'
+                     for i in range(len(self.names)))
 
     def tensor_to_numeric(self, t):
         return list(map(lambda a:
@@ -368,7 +368,7 @@ class FeatureTable(object):
         Returns:
             int: number of segments in `inv` that match feature mask `fts`
         """
-        return len(list(filter(lambda s: self.fts(s, normalize) >= fts, inv)))
+        return sum(1 for s in inv if self.fts(s, normalize) >= fts)
 
     def match_pattern(self, pat: list[str], word: str, normalize: bool=True) -> list[dict[str, int]]:
         """Implements fixed-width pattern matching.
@@ -8,7 +8,7 @@ import pkg_resources
 import yaml
 
 import regex as re
-import unicodecsv as csv
+import csv
 
 from . import _panphon, xsampa
 
@@ -50,15 +50,17 @@ class PermissiveFeatureTable(_panphon.FeatureTable):
         """
         dias = pkg_resources.resource_filename(__name__, dias)
         self.bases, self.names = self._read_ipa_bases(ipa_bases)
+        self._name_idx = {name: i for (i, name) in enumerate(self.names)}
         self.prefix_dias, self.postfix_dias = self._read_dias(dias)
         self.pre_regex, self.post_regex, self.seg_regex = self._compile_seg_regexes(self.bases, self.prefix_dias, self.postfix_dias)
         self.xsampa = xsampa.XSampa()
         self.weights = self._read_weights()
+        self._init_caches()
 
     def _read_ipa_bases(self, fn):
         fn = pkg_resources.resource_filename(__name__, fn)
-        with open(fn, 'rb') as f:
-            reader = csv.reader(f, encoding='utf-8', delimiter=str(','))
+        with open(fn, 'r', encoding='utf-8', newline='') as f:
+            reader = csv.reader(f)
             names = next(reader)[1:]
             bases = {}
             for row in reader:
@@ -92,8 +94,8 @@ class PermissiveFeatureTable(_panphon.FeatureTable):
     def _read_weights(self, filename=os.path.join('data', 'feature_weights.csv')):
         filename = pkg_resources.resource_filename(
             __name__, filename)
-        with open(filename, 'rb') as f:
-            reader = csv.reader(f, encoding='utf-8')
+        with open(filename, 'r', encoding='utf-8', newline='') as f:
+            reader = csv.reader(f)
             next(reader)
             weights = [float(x) for x in next(reader)]
         return weights
@@ -122,6 +124,28 @@ class PermissiveFeatureTable(_panphon.FeatureTable):
         else:
             return None
 
+    def encode_inventory(self, inv):
+        """Encode the valid segments of an inventory as arrays of bitmasks.
+
+        Args:
+            inv (list): a collection of IPA segments represented as Unicode
+                        strings
+
+        Returns:
+            tuple: (plus, minus, zero) uint64 ndarrays with one row per valid
+                   segment in `inv` (invalid segments are dropped) and one
+                   column per 64 features
+        """
+        seg_masks = [m for m in map(self._masks, inv) if m is not None]
+        arr = _panphon.masks_to_array(seg_masks, self._n_words())
+        return arr[:, 0], arr[:, 1], arr[:, 2]
+
+    def _masks(self, segment):
+        fts = self.fts(segment)
+        if fts is None:
+            return None
+        return self._encode_mask(fts)
+
     def fts_match(self, fts_mask, segment):
         """Evaluates whether a set of features 'match' a segment (are a subset
         of that segment's features)
@@ -1,9 +1,18 @@
 from __future__ import print_function, absolute_import, unicode_literals
 
+from functools import lru_cache
+
 from . import _panphon
 from . import permissive
 
-from ._panphon import FeatureTable, fts
+from ._panphon import FeatureTable, MASK_SLOTS
+
+# Feature values tested by the sonority decision tree. The index of each test
+# is the bit it occupies in a key of `Sonority._sonority_lut`.
+SONORITY_TESTS = (('+', 'syl'), ('-', 'hi'), ('-', 'cons'), ('+', 'son'),
+                  ('-', 'nas'), ('+', 'cont'), ('+', 'voi'))
+(_PLUS_SYL, _MINUS_HI, _MINUS_CONS, _PLUS_SON,
+ _MINUS_NAS, _PLUS_CONT, _PLUS_VOI) = range(len(SONORITY_TESTS))
 
 
 class BoolTree(object):
@@ -46,6 +55,45 @@ class Sonority(object):
         fm = {'strict': _panphon.FeatureTable,
               'permissive': permissive.PermissiveFeatureTable}
         self.fm = fm[feature_model](feature_set=feature_set)
+        self._init_caches()
+        # (mask slot, bit index) of each of the `SONORITY_TESTS`.
+        self._sonority_bits = [(MASK_SLOTS[val], self.fm._name_idx[name])
+                               for (val, name) in SONORITY_TESTS]
+        self._sonority_lut = [self._sonority_tree(lambda i: (key >> i) & 1)
+                              for key in range(1 << len(self._sonority_bits))]
+
+    def _init_caches(self):
+        self._sonority_cached = lru_cache(maxsize=4096)(self._sonority)
+
+    def __getstate__(self):
+        state = vars(self).copy()
+        state.pop('_sonority_cached', None)
+        return state
+
+    def __setstate__(self, state):
+        vars(self).update(state)
+        self._init_caches()
+
+    @staticmethod
+    def _sonority_tree(match):
+        """Return the sonority (1 to 9) picked out by the results of the
+        `SONORITY_TESTS`, where `match(i)` is the result of test `i`.
+        """
+        minusHi = BoolTree(match(_MINUS_HI), 9, 8)
+        minusNas = BoolTree(match(_MINUS_NAS), 6, 5)
+        plusVoi1 = BoolTree(match(_PLUS_VOI), 4, 3)
+        plusVoi2 = BoolTree(match(_PLUS_VOI), 2, 1)
+        plusCont = BoolTree(match(_PLUS_CONT), plusVoi1, plusVoi2)
+        plusSon = BoolTree(match(_PLUS_SON), minusNas, plusCont)
+        minusCons = BoolTree(match(_MINUS_CONS), 7, plusSon)
+        plusSyl = BoolTree(match(_PLUS_SYL), minusHi, minusCons)
+        return plusSyl.get_value()
+
+    def _sonority_from_masks(self, seg_masks):
+        key = 0
+        for (i, (slot, bit)) in enumerate(self._sonority_bits):
+            key |= ((seg_masks[slot] >> bit) & 1) << i
+        return self._sonority_lut[key]
 
     def sonority_from_fts(self, seg):
         """Given a segment as features, returns the sonority on a scale of 1
@@ -58,19 +106,12 @@ class Sonority(object):
         Returns:
            int: sonority of `seg` between 1 and 9
         """
-
-        def match(m):
-            return self.fm.match(fts(m), seg)
-
-        minusHi = BoolTree(match('-hi'), 9, 8)
-        minusNas = BoolTree(match('-nas'), 6, 5)
-        plusVoi1 = BoolTree(match('+voi'), 4, 3)
-        plusVoi2 = BoolTree(match('+voi'), 2, 1)
-        plusCont = BoolTree(match('+cont'), plusVoi1, plusVoi2)
-        plusSon = BoolTree(match('+son'), minusNas, plusCont)
-        minusCons = BoolTree(match('-cons'), 7, plusSon)
-        plusSyl = BoolTree(match('+syl'), minusHi, minusCons)
-        return plusSyl.get_value()
+        # Pairs the table does not know cannot affect the tests, so they are
+        # left out rather than making the whole mask unencodable.
+        name_idx = self.fm._name_idx
+        known = [(val, name) for (val, name) in seg
+                 if val in MASK_SLOTS and name in name_idx]
+        return self._sonority_from_masks(self.fm._encode_mask(known))
 
     def sonority(self, seg):
         """Given a segment as a Unicode IPA string, returns the sonority on
@@ -82,4 +123,8 @@ class Sonority(object):
         Returns:
            int: sonority of `seg` between 1 and 9
         """
-        return self.sonority_from_fts(self.fm.fts(seg))
+        return self._sonority_cached(seg)
+
+    def _sonority(self, seg):
+        # Uncached body of `sonority`.
+        return self._sonority_from_masks(self.fm._masks(seg))
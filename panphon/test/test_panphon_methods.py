@@ -1,16 +1,84 @@
 # -*- coding: utf-8 -*-
 from __future__ import print_function, unicode_literals, division, absolute_import
 
+import os
+import pickle
+import shutil
+import tempfile
 import unittest
+from unittest import mock
+
 import panphon._panphon as panphon
 
 dim = 24
 
+
+class TestTableCache(unittest.TestCase):
+
+    def setUp(self):
+        self.ft = panphon.FeatureTable()
+        self.tmpdir = tempfile.mkdtemp()
+        self.csv = os.path.join(self.tmpdir, 'table.csv')
+        with open(self.csv, 'w') as f:
+            f.write('ipa,syl\np,-\n')
+        self.pkl = self.ft._table_cache_filename(self.csv)
+        self.seg_dict = {'p': frozenset([('-', 'syl')])}
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_round_trip(self):
+        self.ft._write_table_cache(self.csv, self.seg_dict, ['syl'])
+        self.assertEqual(self.ft._load_table_cache(self.csv),
+                         (self.seg_dict, ['syl']))
+        self.assertEqual(sorted(os.listdir(self.tmpdir)),
+                         ['table.csv', 'table.pkl'])
+
+    def test_stale_cache(self):
+        self.ft._write_table_cache(self.csv, self.seg_dict, ['syl'])
+        mtime = os.stat(self.csv).st_mtime
+        os.utime(self.csv, (mtime + 10, mtime + 10))
+        self.assertIsNone(self.ft._load_table_cache(self.csv))
+
+    def test_corrupt_cache(self):
+        with open(self.pkl, 'wb') as f:
+            f.write(b'not a pickle')
+        self.assertIsNone(self.ft._load_table_cache(self.csv))
+
+    def test_unwritable_directory(self):
+        with mock.patch('tempfile.mkstemp', side_effect=PermissionError):
+            self.ft._write_table_cache(self.csv, self.seg_dict, ['syl'])
+        with mock.patch('os.replace', side_effect=PermissionError):
+            self.ft._write_table_cache(self.csv, self.seg_dict, ['syl'])
+        self.assertEqual(os.listdir(self.tmpdir), ['table.csv'])
+        self.assertIsNone(self.ft._load_table_cache(self.csv))
+
+class TestSegmentText(unittest.TestCase):
+
+    def test_segment_tuple(self):
+        self.assertEqual(panphon.segment_tuple('pʰat'), ('pʰ', 'a', 't'))
+
+    def test_segment_text(self):
+        self.assertEqual(list(panphon.segment_text('pʰat')), ['pʰ', 'a', 't'])
+
+
 class TestFeatureTableAPI(unittest.TestCase):
 
     def setUp(self):
         self.ft = panphon.FeatureTable()
 
+    def test_table_cache(self):
+        ft = panphon.FeatureTable('panphon')
+        self.assertIs(ft.seg_dict, self.ft.seg_dict)
+        self.assertIs(ft.seg_regex, self.ft.seg_regex)
+
+    def test_pickle(self):
+        self.ft.fts_match([('-', 'voi')], 'p')
+        self.ft.segment_to_vector('p')
+        ft = pickle.loads(pickle.dumps(self.ft))
+        self.assertTrue(ft.fts_match([('-', 'voi')], 'p'))
+        self.assertEqual(ft.segment_to_vector('b'), self.ft.segment_to_vector('b'))
+
     def test_fts(self):
         self.assertEqual(len(self.ft.fts('u')), 24)
 
@@ -19,6 +87,7 @@ class TestFeatureTableAPI(unittest.TestCase):
 
     def test_match(self):
         self.assertTrue(self.ft.match(self.ft.fts('u'), self.ft.fts('u')))
+        self.assertTrue(self.ft.match(panphon.fts('+syl'), panphon.fts('+syl -hi')))
 
     def test_fts_match(self):
         self.assertTrue(self.ft.fts_match(self.ft.fts('u'), 'u'))
@@ -41,6 +110,11 @@ class TestFeatureTableAPI(unittest.TestCase):
     def test_filter_string(self):
         self.assertEqual(len(self.ft.filter_string('pup$')), 3)
 
+    def test_seg_diff(self):
+        self.assertEqual(self.ft.seg_diff('p', 'b'), ['voi'])
+        self.assertEqual(self.ft.seg_diff('p', 'p'), [])
+        self.assertIsNone(self.ft.seg_diff('p', '$'))
+
     def test_segs_safe(self):
         self.assertEqual(len(self.ft.segs_safe('pup$')), 4)
 
@@ -59,9 +133,29 @@ class TestFeatureTableAPI(unittest.TestCase):
     def test_fts_contrast2(self):
         self.assertTrue(self.ft.fts_contrast2([], 'voi', ['p', 'b', 'r']))
 
+    def test_compile_mask(self):
+        voiceless = self.ft.compile_mask([('-', 'voi')])
+        self.assertTrue(voiceless('p'))
+        self.assertFalse(voiceless('b'))
+        self.assertFalse(voiceless('$'))
+        self.assertFalse(self.ft.compile_mask([('+', 'nonfeature')])('p'))
+
     def test_fts_count(self):
         self.assertEqual(self.ft.fts_count([('-', 'voi')], ['p', 't', 'k', 'r']), 3)
         self.assertEqual(self.ft.fts_count([('-', 'voi')], ['r', '$']), 0)
+        self.assertEqual(self.ft.fts_count([('+', 'nonfeature')], ['p', 't']), 0)
+
+    def test_match_masks(self):
+        mask = self.ft._encode_mask([('-', 'voi'), ('+', 'cons')])
+        self.assertTrue(panphon.match_masks(mask, self.ft._masks('p')))
+        self.assertFalse(panphon.match_masks(mask, self.ft._masks('b')))
+
+    def test_encode_inventory(self):
+        inv_masks = self.ft.encode_inventory(['p', 'b', '$', 't'])
+        self.assertEqual(len(inv_masks[0]), 3)
+        mask = self.ft._encode_mask([('-', 'voi')])
+        self.assertEqual(list(panphon.match_inventory(mask, inv_masks)),
+                         [True, False, True])
 
     def test_match_pattern(self):
         self.assertEqual(len(self.ft.match_pattern([set([('-', 'voi')])], 'p')), 1)
@@ -1,8 +1,9 @@
 # -*- coding: utf-8 -*-
 from __future__ import print_function, unicode_literals, division, absolute_import
 
+import pickle
 import unittest
-from panphon import permissive
+from panphon import _panphon, permissive
 
 dim = 24
 
@@ -63,6 +64,13 @@ class TestFeatureTableAPI(unittest.TestCase):
         self.assertEqual(self.ft.fts_count([('-', 'voi')], ['p', 't', 'k', 'r']), 3)
         self.assertEqual(self.ft.fts_count([('-', 'voi')], ['r', '$']), 0)
 
+    def test_encode_inventory(self):
+        inv_masks = self.ft.encode_inventory(['pʰ', 'b', '$', 'tʷ'])
+        self.assertEqual(len(inv_masks[0]), 3)
+        mask = self.ft._encode_mask([('-', 'voi')])
+        self.assertEqual(list(_panphon.match_inventory(mask, inv_masks)),
+                         [True, False, True])
+
     def test_match_pattern(self):
         self.assertEqual(len(self.ft.match_pattern([set([('-', 'voi')])], 'p')), 1)
 
@@ -80,3 +88,8 @@ class TestFeatureTableAPI(unittest.TestCase):
 
     def test_word_to_vector_list(self):
         self.assertEqual(len(self.ft.word_to_vector_list('pup')), 3)
+
+    def test_pickle(self):
+        self.ft.segment_to_vector('p')
+        ft = pickle.loads(pickle.dumps(self.ft))
+        self.assertEqual(ft.segment_to_vector('pʰ'), self.ft.segment_to_vector('pʰ'))
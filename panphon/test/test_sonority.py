@@ -1,8 +1,10 @@
 # -*- coding: utf-8 -*-
 from __future__ import print_function, unicode_literals, division, absolute_import
 
+import pickle
 import unittest
 from panphon import sonority
+from panphon._panphon import fts
 
 
 class TestSonority(unittest.TestCase):
@@ -50,7 +52,17 @@ class TestSonority(unittest.TestCase):
         scores = [2] * 4
         self.assertEqual(list(map(self.son.sonority, segs)), scores)
 
+    def test_sonority_from_fts_unknown_feature(self):
+        self.assertEqual(self.son.sonority_from_fts(fts('+syl -hi +stress')), 9)
+
     def test_sonority_one(self):
         segs = ['p', 'k', 'c', 'q']
         scores = [1] * 4
         self.assertEqual(list(map(self.son.sonority, segs)), scores)
+
+    def test_pickle(self):
+        for son in [self.son, sonority.Sonority()]:
+            son.sonority('a')
+            son = pickle.loads(pickle.dumps(son))
+            self.assertEqual(son.sonority('a'), 9)
+            self.assertEqual(son.sonority('p'), 1)
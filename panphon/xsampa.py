@@ -1,7 +1,7 @@
 from __future__ import absolute_import, print_function, unicode_literals
 
 import regex as re
-import unicodecsv as csv
+import csv
 import os.path
 import pkg_resources
 
@@ -14,8 +14,8 @@ class XSampa(object):
     def read_xsampa_table(self):
         filename = os.path.join('data', 'ipa-xsampa.csv')
         filename = pkg_resources.resource_filename(__name__, filename)
-        with open(filename, 'rb') as f:
-            xs2ipa = {x[1]: x[0] for x in csv.reader(f, encoding='utf-8')}
+        with open(filename, 'r', encoding='utf-8', newline='') as f:
+            xs2ipa = {x[1]: x[0] for x in csv.reader(f)}
         xs = sorted(xs2ipa.keys(), key=len, reverse=True)
         xs_regex = re.compile('|'.join(list(map(re.escape, xs))))
         return xs_regex, xs2ipa